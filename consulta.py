@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+
+import argparse
+import json
+import logging
+import os
+import sys
+
+# Adiciona o diretório 'src' ao path para permitir importações diretas
+src_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "src")
+sys.path.insert(0, src_path)
+
+from consulta_historico import ConsultaHistorico, criar_servidor
+from presenca_diaria import PresencaDiaria
+
+logger = logging.getLogger("locaweb_analyzer")
+
+ARQUIVO_HISTORICO = "data/historico_locaweb.json"
+ARQUIVO_PRESENCA = "data/presenca_locaweb.json"
+ARQUIVO_COMENTARIOS = "data/comentarios_locaweb.json"
+
+
+def _criar_parser():
+    parser = argparse.ArgumentParser(
+        description="Consultas sobre o histórico de IPs reportados."
+    )
+    parser.add_argument(
+        "--historico", default=ARQUIVO_HISTORICO, help="Caminho do arquivo de histórico."
+    )
+    parser.add_argument(
+        "--presenca", default=ARQUIVO_PRESENCA, help="Caminho do arquivo de presença diária."
+    )
+    parser.add_argument(
+        "--comentarios", default=ARQUIVO_COMENTARIOS, help="Caminho da tabela de comentários."
+    )
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p_ip = sub.add_parser("ip", help="Busca um IP específico.")
+    p_ip.add_argument("ip")
+
+    p_cidr = sub.add_parser("cidr", help="Busca IPs dentro de uma faixa CIDR.")
+    p_cidr.add_argument("rede", help="Ex.: 187.45.198.0/24")
+
+    p_filtrar = sub.add_parser("filtrar", help="Filtra por categoria e/ou data.")
+    p_filtrar.add_argument("--categoria")
+    p_filtrar.add_argument("--desde", help="Data inicial (dd/mm/aaaa).")
+    p_filtrar.add_argument("--ate", help="Data final (dd/mm/aaaa).")
+
+    p_indicador = sub.add_parser(
+        "indicador", help="Busca IPs cujos comentários citam uma porta, protocolo ou serviço."
+    )
+    p_indicador.add_argument("valor", help="Ex.: 22, tcp, ssh")
+
+    p_top = sub.add_parser("top", help="Agregados top-N.")
+    p_top.add_argument("criterio", choices=ConsultaHistorico.CRITERIOS_TOP)
+    p_top.add_argument("-n", type=int, default=10)
+
+    p_presenca = sub.add_parser("presenca", help="Dias em que um IP esteve listado.")
+    p_presenca.add_argument("ip")
+    p_presenca.add_argument("--dias", type=int, default=90)
+
+    p_tendencia = sub.add_parser("tendencia", help="Relatório semanal de tendência por /24.")
+    p_tendencia.add_argument("-n", type=int, default=10)
+
+    p_servidor = sub.add_parser("servidor", help="Sobe o endpoint HTTP local de consulta.")
+    p_servidor.add_argument("--host", default="127.0.0.1")
+    p_servidor.add_argument("--porta", type=int, default=8080)
+
+    return parser
+
+
+def _consultar(consulta, args):
+    if args.comando == "ip":
+        return consulta.buscar_ip(args.ip)
+    if args.comando == "cidr":
+        return consulta.buscar_cidr(args.rede)
+    if args.comando == "filtrar":
+        return consulta.filtrar(args.categoria, args.desde, args.ate)
+    if args.comando == "indicador":
+        return consulta.buscar_indicador(args.valor)
+    return consulta.top(args.criterio, args.n)
+
+
+def main(argv=None):
+    """
+    Ponto de entrada da CLI de consulta ao histórico.
+    """
+    args = _criar_parser().parse_args(argv)
+
+    if args.comando == "servidor":
+        from settings import configurar_logging
+
+        configurar_logging()
+
+    if args.comando in ("presenca", "tendencia"):
+        presenca = PresencaDiaria(args.presenca)
+        if args.comando == "presenca":
+            resultado = presenca.dias_listado(args.ip, args.dias)
+        else:
+            resultado = presenca.tendencia_semanal(n=args.n)
+        print(json.dumps(resultado, ensure_ascii=False, indent=4))
+        return 0
+
+    consulta = ConsultaHistorico(args.historico, args.comentarios)
+
+    if args.comando == "servidor":
+        servidor = criar_servidor(consulta, args.host, args.porta)
+        logger.info(f"Servidor de consulta em http://{args.host}:{args.porta}")
+        try:
+            servidor.serve_forever()
+        except KeyboardInterrupt:
+            logger.info("Servidor de consulta finalizado.")
+        finally:
+            servidor.server_close()
+        return 0
+
+    try:
+        resultado = _consultar(consulta, args)
+    except ValueError as e:
+        # CIDR ou data inválidos (AddressValueError é um ValueError)
+        print(f"Consulta inválida: {e}", file=sys.stderr)
+        return 1
+    if resultado is None:
+        print(f"IP {args.ip} não encontrado no histórico.", file=sys.stderr)
+        return 1
+
+    print(json.dumps(resultado, ensure_ascii=False, indent=4))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,36 +4,42 @@ import logging
 import os
 import sys
 
-from dotenv import load_dotenv  # Importa load_dotenv
-
 # Adiciona o diretório 'src' ao path para permitir importações diretas
 src_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "src")
 sys.path.insert(0, src_path)
 
-# Carrega as variáveis do .env para o ambiente
-load_dotenv()
-
-from analisador_locaweb import AnalisadorLocaweb
-# Agora podemos importar os módulos de 'src'
-from settings import LOG_CONFIG_DICT
-
-# Configura o logging assim que a aplicação inicia
-logging.config.dictConfig(LOG_CONFIG_DICT)
 logger = logging.getLogger("locaweb_analyzer")  # Pega o logger principal
 
 
 def main():
     """
     Função principal que orquestra a execução do projeto.
+
+    As dependências são importadas aqui, e não no topo do módulo, para que
+    cada subsistema (HTTP, e-mail, configuração de log) só seja carregado
+    quando a execução de fato precisar dele.
     """
+    from dotenv import load_dotenv
+
+    # Carrega as variáveis do .env para o ambiente (único ponto de carga)
+    load_dotenv()
+
+    from settings import configurar_logging
+
+    # Configura o logging assim que a aplicação inicia
+    configurar_logging()
     logger.info("Aplicação iniciada pelo main.py")
 
     try:
+        from analisador_locaweb import AnalisadorLocaweb
+
         analisador = AnalisadorLocaweb(
             url_blocklist="https://raw.githubusercontent.com/borestad/blocklist-abuseipdb/refs/heads/main/abuseipdb-s100-14d.ipv4",
             arquivo_historico="data/historico_locaweb.json",
             arquivo_diario="data/novos_locaweb_diario.json",  # Para IPs Locaweb (outros)
             arquivo_diario_kinghost="data/novos_kinghost_diario.json",  # Para IPs KingHost
+            arquivo_presenca="data/presenca_locaweb.json",  # Presença diária para tendências
+            arquivo_comentarios="data/comentarios_locaweb.json",  # Comentários deduplicados do histórico
         )
         analisador.executar()
     except Exception:
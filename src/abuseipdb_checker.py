@@ -6,6 +6,9 @@ from datetime import datetime
 
 import requests
 
+from src.cliente_http import obter_cliente_http
+from src.repositorio_comentarios import normalizar_comentarios
+
 # load_dotenv() não é mais chamado aqui, pois o main.py fará isso.
 
 logger = logging.getLogger(__name__)
@@ -42,19 +45,17 @@ class AbuseIPDBChecker:
         23: "IoT Targeted",
     }
 
-    def __init__(self):
+    def __init__(self, cliente_http=None):
+        self.cliente = cliente_http or obter_cliente_http()
         self.api_key = os.getenv("ABUSEIPDB_API_KEY")
-        if not self.api_key:
+        # Ao reproduzir um cassete nenhuma requisição sai para a rede, então a chave é dispensável
+        if not self.api_key and not self.cliente.reproduzindo:
             logger.critical(
                 "A chave da API do AbuseIPDB não foi encontrada nas variáveis de ambiente!"
             )
             raise ValueError("Chave da API não configurada.")
         self.base_url = "https://api.abuseipdb.com/api/v2/reports"
-        self.headers = {"Accept": "application/json", "Key": self.api_key}
-
-    def _formatar_comentario(self, comentario):
-        """Limpa e formata um comentário para melhor legibilidade."""
-        return " ".join(comentario.strip().split())
+        self.headers = {"Accept": "application/json", "Key": self.api_key or ""}
 
     def _formatar_data(self, data_str):
         """Converte a data do formato ISO para o formato brasileiro."""
@@ -73,7 +74,7 @@ class AbuseIPDBChecker:
 
         logger.debug(f"Consultando AbuseIPDB para o IP: {ip_address}")
         try:
-            response = requests.get(self.base_url, headers=self.headers, params=params)
+            response = self.cliente.get(self.base_url, headers=self.headers, params=params)
             response.raise_for_status()
             dados = response.json().get("data", {})
 
@@ -93,11 +94,12 @@ class AbuseIPDBChecker:
                 for cat_id in sorted(list(categorias_ids))
             ]
 
-            comentarios = []
-            for relatorio in dados.get("results", []):
-                comentario_formatado = self._formatar_comentario(relatorio["comment"])
-                data_formatada = self._formatar_data(relatorio["reportedAt"])
-                comentarios.append(f"[{data_formatada}] {comentario_formatado}")
+            # Normaliza os textos do lote com um único padrão pré-compilado;
+            # as datas continuam sendo formatadas uma a uma.
+            relatorios = dados.get("results", [])
+            textos = normalizar_comentarios(r["comment"] for r in relatorios)
+            datas = [self._formatar_data(r["reportedAt"]) for r in relatorios]
+            comentarios = [f"[{data}] {texto}" for data, texto in zip(datas, textos)]
 
             return {
                 "categorias_reportadas": categorias_nomes,
@@ -18,22 +18,68 @@ from src.notificador_email import NotificadorEmail
 
 from src.abuseipdb_checker import AbuseIPDBChecker
 
+from src.presenca_diaria import PresencaDiaria
+
+from src.cliente_http import obter_cliente_http
+
+from src.repositorio_comentarios import RepositorioComentarios
+
 class AnalisadorLocaweb:
     """
     Busca IPs da Locaweb em uma blocklist usando regex, obtém informações
     adicionais e aplica a regra de 30 dias para reportar IPs.
     """
 
-    def __init__(self, url_blocklist, arquivo_historico, arquivo_diario, arquivo_diario_kinghost):
+    def __init__(self, url_blocklist, arquivo_historico, arquivo_diario, arquivo_diario_kinghost, arquivo_presenca=None, arquivo_comentarios=None, cliente_http=None):
         self.url_blocklist = url_blocklist
         # Os caminhos já vêm resolvidos do main.py
         self.arquivo_historico = arquivo_historico
         self.arquivo_diario = arquivo_diario # Este será para Locaweb (outros)
         self.arquivo_diario_kinghost = arquivo_diario_kinghost # Novo arquivo para KingHost
+        self.arquivo_presenca = arquivo_presenca
+        self.arquivo_comentarios = arquivo_comentarios
         self.provedor_alvo = "Locaweb Serviços de Internet S/A"
         self.hoje = datetime.now()
-        self.s = requests.Session()
-        self.s.headers.update({'User-Agent': 'Mozilla/5.0'})
+        # Cliente HTTP compartilhado (pool, timeouts e retentativas)
+        self.cliente = cliente_http or obter_cliente_http()
+
+        if self.cliente.reproduzindo:
+            self._preparar_reproducao()
+
+        # Bitset diário de presença na blocklist (opcional), usado nas análises de tendência
+        self.presenca = PresencaDiaria(self.arquivo_presenca) if self.arquivo_presenca else None
+        # Tabela de comentários deduplicados referenciada pelo histórico (opcional)
+        self.comentarios = RepositorioComentarios(self.arquivo_comentarios) if self.arquivo_comentarios else None
+
+    def _preparar_reproducao(self):
+        """
+        Restaura o estado de entrada gravado no cassete (data de referência,
+        histórico e comentários) e redireciona todas as saídas para o
+        diretório de reprodução, para não tocar nos arquivos de dados.
+        """
+        cassete = self.cliente.cassete
+        contexto = cassete.contexto
+        if contexto is None:
+            raise ValueError(f"Cassete sem contexto de execução: {cassete.arquivo_cassete}")
+
+        saida = cassete.diretorio_saida
+        if os.path.abspath(saida) == os.path.abspath(os.path.dirname(self.arquivo_historico) or "."):
+            raise ValueError("O diretório de saída da reprodução não pode ser o diretório de dados.")
+
+        def redirecionar(caminho):
+            return os.path.join(saida, os.path.basename(caminho)) if caminho else caminho
+
+        self.arquivo_historico = redirecionar(self.arquivo_historico)
+        self.arquivo_diario = redirecionar(self.arquivo_diario)
+        self.arquivo_diario_kinghost = redirecionar(self.arquivo_diario_kinghost)
+        self.arquivo_presenca = redirecionar(self.arquivo_presenca)
+        self.arquivo_comentarios = redirecionar(self.arquivo_comentarios)
+
+        self.hoje = datetime.fromisoformat(contexto['hoje'])
+        self._salvar_json(self.arquivo_historico, contexto['historico'])
+        if self.arquivo_comentarios:
+            self._salvar_json(self.arquivo_comentarios, contexto.get('comentarios', {}))
+        logger.info(f"Reproduzindo execução de {self.hoje:%d/%m/%Y %H:%M:%S}; saídas em: {saida}")
 
     def _carregar_historico(self):
         if not os.path.exists(self.arquivo_historico):
@@ -56,13 +102,49 @@ class AnalisadorLocaweb:
             with open(caminho_arquivo, 'w', encoding='utf-8') as f:
                 json.dump(dados, f, ensure_ascii=False, indent=4)
             logger.info(f"Dados salvos com sucesso em: {caminho_arquivo}")
+            return True
         except IOError:
             logger.debug(f"Erro ao salvar o arquivo {caminho_arquivo}.", exc_info=True)
+            return False
+
+    def _salvar_historico(self, historico):
+        """
+        Salva o histórico. Com a tabela de comentários ativa, cada comentário
+        é gravado uma única vez nela e o registro guarda apenas {data, id}.
+        Os arquivos diários (anexos do e-mail) continuam com o texto completo.
+
+        A ordem de gravação garante que o histórico em disco nunca aponte
+        para IDs ausentes: primeiro os comentários novos, depois o
+        histórico e, só se ele foi salvo, a poda dos órfãos.
+        """
+        registros = list(historico.values())
+        if self.comentarios is None:
+            self._salvar_json(self.arquivo_historico, registros)
+            return
+
+        compactados = []
+        ids_referenciados = set()
+        for registro in registros:
+            registro = registro.copy()
+            registro['comentarios_recentes'] = self.comentarios.compactar(
+                registro.get('comentarios_recentes', [])
+            )
+            ids_referenciados.update(ref['id'] for ref in registro['comentarios_recentes'])
+            compactados.append(registro)
+
+        if not self.comentarios.salvar():
+            # Sem a tabela atualizada, os registros novos ficam com o texto completo
+            logger.error("Falha ao salvar a tabela de comentários; histórico salvo sem compactar.")
+            self._salvar_json(self.arquivo_historico, registros)
+            return
+        if self._salvar_json(self.arquivo_historico, compactados):
+            if self.comentarios.podar(ids_referenciados):
+                self.comentarios.salvar()
 
     def baixar_e_filtrar_blocklist(self):
         logger.info(f"Baixando e filtrando a blocklist de: {self.url_blocklist}")
         try:
-            r = self.s.get(self.url_blocklist)
+            r = self.cliente.get(self.url_blocklist)
             r.raise_for_status()
             
             regex = re.compile(r"^(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})\s+.*?\s+(AS\d+)\s+(Locaweb[\w\s.-]*S\/A)", re.MULTILINE)
@@ -78,6 +160,9 @@ class AnalisadorLocaweb:
                 })
             
             logger.info(f"Encontrados {len(ips_encontrados)} IPs da Locaweb diretamente no arquivo.")
+
+            if self.presenca is not None:
+                self.presenca.registrar([item['ip'] for item in ips_encontrados], self.hoje.date())
             return ips_encontrados
         except requests.exceptions.RequestException:
             logger.debug("Erro ao baixar a blocklist.", exc_info=True)
@@ -87,7 +172,7 @@ class AnalisadorLocaweb:
         logger.debug(f"Consultando API para obter o hostname do IP: {ip}")
         url_api = f"http://ip-api.com/json/{ip}?fields=status,message,reverse"
         try:
-            r = self.s.get(url_api)
+            r = self.cliente.get(url_api)
             r.raise_for_status()
             dados = r.json()
             if dados.get("status") == "success":
@@ -147,17 +232,29 @@ class AnalisadorLocaweb:
         historico_locaweb = self._carregar_historico()
         logger.info(f"{len(historico_locaweb)} IPs da Locaweb no histórico.")
 
+        if self.cliente.gravando:
+            # Estado de entrada da execução, para que a reprodução repita as mesmas decisões
+            self.cliente.cassete.gravar_contexto({
+                "hoje": self.hoje.isoformat(),
+                "historico": list(historico_locaweb.values()),
+                "comentarios": self.comentarios.tabela if self.comentarios is not None else {},
+            })
+
         ips_locaweb_na_blocklist = self.baixar_e_filtrar_blocklist()
+        if self.presenca is not None:
+            self.presenca.salvar()
 
         if not ips_locaweb_na_blocklist:
             logger.info("Nenhum IP da Locaweb encontrado na blocklist hoje.")
             self._salvar_json(self.arquivo_diario, [])
             self._salvar_json(self.arquivo_diario_kinghost, []) # Garante que o arquivo KingHost seja limpo
+            # Inclui o caso de falha no download da blocklist, quando as métricas mais importam
+            logger.info(self.cliente.resumo_metricas())
             return
 
         # Instancia o verificador do AbuseIPDB uma vez
         
-        verificador_abuso = AbuseIPDBChecker()
+        verificador_abuso = AbuseIPDBChecker(self.cliente)
 
         relatorio_diario_completo = [] # Todos os IPs que serão adicionados ao histórico
         relatorio_diario_kinghost = []
@@ -181,7 +278,8 @@ class AnalisadorLocaweb:
                     logger.debug(f"IP RECENTE da Locaweb (ignorado): {ip}")
 
             if deve_reportar:
-                time.sleep(1) # Pausa para não sobrecarregar as APIs
+                if not self.cliente.reproduzindo:
+                    time.sleep(1) # Pausa para não sobrecarregar as APIs
                 hostname = self.obter_hostname(ip)
                 info_abuso = verificador_abuso.verificar_ip(ip)
                 
@@ -204,10 +302,15 @@ class AnalisadorLocaweb:
         self._salvar_json(self.arquivo_diario_kinghost, relatorio_diario_kinghost)
         self._salvar_json(self.arquivo_diario, relatorio_diario_locaweb_outros)
 
-        self._salvar_json(self.arquivo_historico, list(historico_locaweb.values()))
+        self._salvar_historico(historico_locaweb)
         logger.info("--- Análise Otimizada Concluída ---")
+        logger.info(self.cliente.resumo_metricas())
+
+        # Envio de e-mail de notificação (nunca ao reproduzir um cassete)
+        if self.cliente.reproduzindo:
+            logger.info("Modo de reprodução de cassete: e-mails de notificação não serão enviados.")
+            return
 
-        # Envio de e-mail de notificação
         if relatorio_diario_kinghost:
             try:
                 notificador = NotificadorEmail()
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+
+import base64
+import gzip
+import json
+import logging
+import os
+import tempfile
+import time
+from collections import defaultdict, deque
+from urllib.parse import urlencode
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+logger = logging.getLogger(__name__)
+
+
+class CasseteHTTP:
+    """
+    Grava as trocas HTTP de uma execução em um arquivo JSON Lines
+    comprimido com gzip, ou reproduz essas respostas localmente, sem rede.
+    Apenas método, URL, parâmetros e a resposta são gravados; os cabeçalhos
+    da requisição (onde fica a chave da API) nunca vão para o arquivo.
+
+    Além das trocas, o cassete guarda um cabeçalho de contexto com o estado
+    de entrada da execução (data de referência, histórico e comentários),
+    para que a reprodução repita as mesmas decisões. Na reprodução, as
+    saídas vão para `diretorio_saida`, nunca para os arquivos de dados.
+    """
+
+    MODOS = ("gravar", "reproduzir")
+    CABECALHOS_GRAVADOS = ("Content-Type", "Retry-After")
+
+    def __init__(self, arquivo_cassete, modo, fator_latencia=0.0, diretorio_saida=None):
+        if modo not in self.MODOS:
+            raise ValueError(f"Modo de cassete inválido: {modo}. Use um de: {', '.join(self.MODOS)}.")
+        self.arquivo_cassete = arquivo_cassete
+        self.modo = modo
+        # 0 reproduz o mais rápido possível; 1.0 simula a latência gravada
+        self.fator_latencia = fator_latencia
+        self._gravadas = defaultdict(deque)
+        self.contexto = None
+        self.diretorio_saida = diretorio_saida
+
+        if modo == "gravar":
+            # Cada troca é anexada como um membro gzip independente, então
+            # uma execução interrompida ainda deixa um cassete legível.
+            open(self.arquivo_cassete, 'wb').close()
+            logger.info(f"Gravando tráfego HTTP em: {self.arquivo_cassete}")
+        else:
+            self._carregar()
+            if self.diretorio_saida is None:
+                self.diretorio_saida = tempfile.mkdtemp(prefix="cassete_reproducao_")
+            os.makedirs(self.diretorio_saida, exist_ok=True)
+            logger.info(f"Saídas da reprodução serão gravadas em: {self.diretorio_saida}")
+
+    @property
+    def gravando(self):
+        return self.modo == "gravar"
+
+    @property
+    def reproduzindo(self):
+        return self.modo == "reproduzir"
+
+    @staticmethod
+    def _chave(metodo, url, params=None):
+        if params:
+            url = f"{url}?{urlencode(sorted(dict(params).items()))}"
+        return f"{metodo.upper()} {url}"
+
+    def _carregar(self):
+        if not os.path.exists(self.arquivo_cassete):
+            raise FileNotFoundError(f"Cassete não encontrado: {self.arquivo_cassete}")
+        total = 0
+        with gzip.open(self.arquivo_cassete, 'rt', encoding='utf-8') as f:
+            for linha in f:
+                troca = json.loads(linha)
+                if "contexto" in troca:
+                    self.contexto = troca["contexto"]
+                    continue
+                self._gravadas[troca['chave']].append(troca)
+                total += 1
+        logger.info(f"Cassete carregado com {total} respostas: {self.arquivo_cassete}")
+
+    def _anexar(self, entrada):
+        with gzip.open(self.arquivo_cassete, 'at', encoding='utf-8') as f:
+            f.write(json.dumps(entrada, ensure_ascii=False) + "\n")
+
+    def gravar_contexto(self, contexto):
+        """Grava o estado de entrada da execução (data, histórico etc.)."""
+        self._anexar({"contexto": contexto})
+
+    def gravar(self, metodo, url, params, resposta, latencia):
+        """Anexa ao cassete a resposta recebida para a requisição."""
+        try:
+            corpo = {"texto": resposta.content.decode('utf-8')}
+        except UnicodeDecodeError:
+            corpo = {"base64": base64.b64encode(resposta.content).decode('ascii')}
+        troca = {
+            "chave": self._chave(metodo, url, params),
+            "status": resposta.status_code,
+            "cabecalhos": {
+                nome: resposta.headers[nome]
+                for nome in self.CABECALHOS_GRAVADOS
+                if nome in resposta.headers
+            },
+            "latencia": round(latencia, 4),
+            **corpo,
+        }
+        self._anexar(troca)
+
+    def reproduzir(self, metodo, url, params=None):
+        """
+        Devolve a próxima resposta gravada para a requisição. A última
+        resposta de cada chave é reaproveitada se a execução pedir mais vezes.
+        """
+        chave = self._chave(metodo, url, params)
+        fila = self._gravadas.get(chave)
+        if not fila:
+            raise requests.exceptions.ConnectionError(f"Nenhuma resposta gravada para: {chave}")
+        troca = fila.popleft() if len(fila) > 1 else fila[0]
+
+        if self.fator_latencia:
+            time.sleep(troca['latencia'] * self.fator_latencia)
+
+        resposta = requests.Response()
+        resposta.status_code = troca['status']
+        resposta.headers = CaseInsensitiveDict(troca['cabecalhos'])
+        resposta.url = chave.split(" ", 1)[1]
+        resposta.encoding = 'utf-8'
+        if "base64" in troca:
+            resposta._content = base64.b64decode(troca['base64'])
+        else:
+            resposta._content = troca['texto'].encode('utf-8')
+        return resposta
@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+
+import logging
+import os
+import random
+import time
+from datetime import datetime, timezone
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.cassete_http import CasseteHTTP
+
+logger = logging.getLogger(__name__)
+
+
+class RespostaMuitoGrandeError(requests.exceptions.RequestException):
+    """Resposta excedeu o tamanho máximo permitido pelo cliente."""
+
+
+class ClienteHTTP:
+    """
+    Cliente HTTP compartilhado pelos módulos do projeto: pool de conexões
+    keep-alive por host, timeouts de conexão e leitura, retentativas com
+    backoff e jitter (somente para métodos idempotentes), compressão gzip
+    e limite de tamanho de resposta. Latência e retentativas de cada
+    requisição são registradas no log e acumuladas em `metricas`. Com um
+    cassete, as trocas são gravadas ou reproduzidas sem acesso à rede.
+    """
+
+    METODOS_IDEMPOTENTES = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+    STATUS_RETENTAVEIS = frozenset({429, 500, 502, 503, 504})
+    ERROS_RETENTAVEIS = (
+        requests.exceptions.ConnectionError,
+        requests.exceptions.Timeout,
+        requests.exceptions.ChunkedEncodingError,
+    )
+
+    def __init__(
+        self,
+        timeout_conexao=5,
+        timeout_leitura=30,
+        max_tentativas=3,
+        backoff_base=1.0,
+        backoff_max=30.0,
+        tamanho_maximo=50 * 1024 * 1024,
+        conexoes_por_host=10,
+        cassete=None,
+    ):
+        self.timeout = (timeout_conexao, timeout_leitura)
+        self.max_tentativas = max_tentativas
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.tamanho_maximo = tamanho_maximo
+        self.cassete = cassete
+
+        self.sessao = requests.Session()
+        # As retentativas são feitas aqui, e não pelo urllib3, para que
+        # possam ser contadas e respeitem a regra de idempotência.
+        adaptador = HTTPAdapter(pool_maxsize=conexoes_por_host, max_retries=0)
+        self.sessao.mount("http://", adaptador)
+        self.sessao.mount("https://", adaptador)
+        self.sessao.headers.update({
+            'User-Agent': 'Mozilla/5.0',
+            'Accept-Encoding': 'gzip, deflate',
+        })
+
+        self.metricas = {
+            "requisicoes": 0,
+            "retentativas": 0,
+            "falhas": 0,
+            "latencia_total": 0.0,
+            "latencia_max": 0.0,
+        }
+
+    def get(self, url, **kwargs):
+        return self.requisitar("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.requisitar("POST", url, **kwargs)
+
+    def requisitar(self, metodo, url, idempotente=None, **kwargs):
+        """
+        Executa a requisição e retorna a resposta com o corpo já lido.
+        Métodos não idempotentes só são repetidos se `idempotente=True`.
+        """
+        metodo = metodo.upper()
+        if self.reproduzindo:
+            inicio = time.perf_counter()
+            resposta = self.cassete.reproduzir(metodo, url, kwargs.get("params"))
+            self._registrar(metodo, url, inicio, 0, status=resposta.status_code)
+            return resposta
+        if idempotente is None:
+            idempotente = metodo in self.METODOS_IDEMPOTENTES
+        tentativas = self.max_tentativas if idempotente else 1
+        kwargs.setdefault("timeout", self.timeout)
+
+        inicio = time.perf_counter()
+        for tentativa in range(1, tentativas + 1):
+            try:
+                resposta = self.sessao.request(metodo, url, stream=True, **kwargs)
+                if resposta.status_code in self.STATUS_RETENTAVEIS and tentativa < tentativas:
+                    espera = self._calcular_espera(tentativa, resposta.headers.get("Retry-After"))
+                    if espera is not None:
+                        logger.debug(
+                            f"{metodo} {url} retornou {resposta.status_code}; nova tentativa em {espera:.1f}s."
+                        )
+                        resposta.close()
+                        time.sleep(espera)
+                        continue
+                    # Retry-After além do limite (ex.: cota diária esgotada): repetir não adianta
+                    logger.debug(
+                        f"{metodo} {url} retornou {resposta.status_code} com Retry-After "
+                        f"{resposta.headers.get('Retry-After')}; sem nova tentativa."
+                    )
+                self._ler_corpo(resposta)
+            except self.ERROS_RETENTAVEIS as e:
+                if tentativa >= tentativas:
+                    self._registrar(metodo, url, inicio, tentativa - 1, falha=True)
+                    raise
+                espera = self._calcular_espera(tentativa)
+                logger.debug(f"{metodo} {url} falhou ({e}); nova tentativa em {espera:.1f}s.")
+                time.sleep(espera)
+                continue
+            except requests.exceptions.RequestException:
+                self._registrar(metodo, url, inicio, tentativa - 1, falha=True)
+                raise
+
+            self._registrar(metodo, url, inicio, tentativa - 1, status=resposta.status_code)
+            if self.cassete is not None:
+                self.cassete.gravar(
+                    metodo, url, kwargs.get("params"), resposta, time.perf_counter() - inicio
+                )
+            return resposta
+
+    @property
+    def gravando(self):
+        """Indica se as trocas estão sendo gravadas em um cassete."""
+        return self.cassete is not None and self.cassete.gravando
+
+    @property
+    def reproduzindo(self):
+        """Indica se as respostas vêm de um cassete, e não da rede."""
+        return self.cassete is not None and self.cassete.reproduzindo
+
+    def _calcular_espera(self, tentativa, retry_after=None):
+        """
+        Backoff exponencial com jitter. Com Retry-After (segundos ou data
+        HTTP), respeita o valor pedido; retorna None se ele passar de
+        `backoff_max` ou não puder ser interpretado, indicando que não
+        vale a pena tentar de novo.
+        """
+        if retry_after is not None:
+            espera = self._segundos_retry_after(retry_after)
+            if espera is None or espera > self.backoff_max:
+                return None
+            return espera
+        teto = min(self.backoff_max, self.backoff_base * 2 ** (tentativa - 1))
+        return teto / 2 + random.uniform(0, teto / 2)
+
+    @staticmethod
+    def _segundos_retry_after(retry_after):
+        try:
+            return max(float(retry_after), 0.0)
+        except ValueError:
+            pass
+        from email.utils import parsedate_to_datetime
+        try:
+            data = parsedate_to_datetime(retry_after)
+        except (TypeError, ValueError):
+            return None
+        if data.tzinfo is None:
+            return None
+        return max((data - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+    def _ler_corpo(self, resposta):
+        """Lê o corpo respeitando o limite de tamanho (já descomprimido)."""
+        tamanho_declarado = resposta.headers.get("Content-Length")
+        if tamanho_declarado and tamanho_declarado.isdigit() and int(tamanho_declarado) > self.tamanho_maximo:
+            resposta.close()
+            raise RespostaMuitoGrandeError(
+                f"Resposta de {resposta.url} declara {tamanho_declarado} bytes (limite {self.tamanho_maximo})."
+            )
+        partes = []
+        lidos = 0
+        for parte in resposta.iter_content(chunk_size=64 * 1024):
+            lidos += len(parte)
+            if lidos > self.tamanho_maximo:
+                resposta.close()
+                raise RespostaMuitoGrandeError(
+                    f"Resposta de {resposta.url} excedeu o limite de {self.tamanho_maximo} bytes."
+                )
+            partes.append(parte)
+        resposta._content = b"".join(partes)
+        resposta._content_consumed = True
+
+    def _registrar(self, metodo, url, inicio, retentativas, status=None, falha=False):
+        latencia = time.perf_counter() - inicio
+        self.metricas["requisicoes"] += 1
+        self.metricas["retentativas"] += retentativas
+        self.metricas["falhas"] += int(falha)
+        self.metricas["latencia_total"] += latencia
+        self.metricas["latencia_max"] = max(self.metricas["latencia_max"], latencia)
+        resultado = "falha" if falha else status
+        logger.debug(
+            f"{metodo} {url} -> {resultado} em {latencia * 1000:.0f} ms ({retentativas} retentativas)"
+        )
+
+    def resumo_metricas(self):
+        m = self.metricas
+        media = m["latencia_total"] / m["requisicoes"] if m["requisicoes"] else 0.0
+        return (
+            f"HTTP: {m['requisicoes']} requisições, {m['retentativas']} retentativas, "
+            f"{m['falhas']} falhas, latência média {media * 1000:.0f} ms, "
+            f"máxima {m['latencia_max'] * 1000:.0f} ms."
+        )
+
+
+_cliente_compartilhado = None
+
+
+def obter_cliente_http():
+    """
+    Retorna a instância de ClienteHTTP compartilhada pelo processo.
+    As variáveis HTTP_CASSETE_MODO (gravar ou reproduzir),
+    HTTP_CASSETE_ARQUIVO, HTTP_CASSETE_FATOR_LATENCIA e HTTP_CASSETE_SAIDA
+    (diretório das saídas da reprodução) ativam o cassete.
+    """
+    global _cliente_compartilhado
+    if _cliente_compartilhado is None:
+        cassete = None
+        modo = os.getenv("HTTP_CASSETE_MODO")
+        if modo:
+            cassete = CasseteHTTP(
+                os.getenv("HTTP_CASSETE_ARQUIVO", os.path.join("data", "cassete_http.jsonl.gz")),
+                modo,
+                fator_latencia=float(os.getenv("HTTP_CASSETE_FATOR_LATENCIA", 0)),
+                diretorio_saida=os.getenv("HTTP_CASSETE_SAIDA"),
+            )
+        _cliente_compartilhado = ClienteHTTP(cassete=cassete)
+    return _cliente_compartilhado
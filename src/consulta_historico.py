@@ -0,0 +1,301 @@
+# -*- coding: utf-8 -*-
+
+import bisect
+import ipaddress
+import json
+import logging
+import os
+import threading
+from collections import Counter
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from src.repositorio_comentarios import (
+    RepositorioComentarios,
+    extrair_indicadores,
+    separar_comentario,
+)
+
+logger = logging.getLogger(__name__)
+
+FORMATO_DATA = "%d/%m/%Y"
+# Marcador gravado pelo AbuseIPDBChecker quando a consulta à API falha;
+# não é uma categoria de abuso e fica fora dos índices e agregados.
+CATEGORIA_ERRO_CONSULTA = "Erro na consulta"
+
+
+class ConsultaHistorico:
+    """
+    Índice em memória sobre o arquivo de histórico, com consultas por IP,
+    faixa CIDR, categoria/data, indicador (porta, protocolo ou serviço
+    citado nos comentários) e agregados top-N. O índice é reconstruído
+    automaticamente quando o histórico ou a tabela de comentários mudam.
+    """
+
+    CRITERIOS_TOP = ("categoria", "prefixo24", "sufixo_hostname")
+
+    def __init__(self, arquivo_historico, arquivo_comentarios=None):
+        self.arquivo_historico = arquivo_historico
+        self.arquivo_comentarios = arquivo_comentarios
+        self._assinatura = None
+        self._trava = threading.Lock()
+        self._indice = _Indice([], None)
+        self.recarregar_se_alterado()
+
+    def _assinatura_arquivo(self):
+        assinatura = []
+        for caminho in (self.arquivo_historico, self.arquivo_comentarios):
+            try:
+                st = os.stat(caminho)
+                assinatura.append((st.st_mtime_ns, st.st_size))
+            except (OSError, TypeError):
+                assinatura.append(None)
+        return tuple(assinatura)
+
+    def recarregar_se_alterado(self):
+        """Reconstrói o índice se o arquivo mudou. Retorna True se recarregou."""
+        with self._trava:
+            assinatura = self._assinatura_arquivo()
+            if assinatura == self._assinatura:
+                return False
+            self._assinatura = assinatura
+            # O índice novo é montado à parte e trocado de uma vez, para que
+            # consultas concorrentes nunca vejam um índice pela metade.
+            repositorio = None
+            if assinatura[1] is not None:
+                repositorio = RepositorioComentarios(self.arquivo_comentarios)
+            self._indice = _Indice(self._ler_registros(), repositorio)
+            logger.info(f"Índice de consulta construído com {len(self._indice.por_ip)} IPs.")
+            return True
+
+    def _ler_registros(self):
+        if self._assinatura[0] is None:
+            return []
+        try:
+            with open(self.arquivo_historico, 'r', encoding='utf-8') as f:
+                conteudo = f.read()
+            if not conteudo.strip():
+                return []
+            return json.loads(conteudo)
+        except (json.JSONDecodeError, IOError):
+            logger.debug("Falha ao carregar histórico para consulta.", exc_info=True)
+            return []
+
+    def buscar_ip(self, ip):
+        """Retorna o registro do IP no histórico, ou None."""
+        return self._indice.por_ip.get(ip)
+
+    def buscar_cidr(self, cidr):
+        """Retorna os registros cujos IPs pertencem à rede informada."""
+        indice = self._indice
+        rede = ipaddress.IPv4Network(cidr, strict=False)
+        inicio = bisect.bisect_left(indice.ips_numericos, int(rede.network_address))
+        fim = bisect.bisect_right(indice.ips_numericos, int(rede.broadcast_address))
+        return [indice.por_ip[ip] for ip in indice.ips_ordenados[inicio:fim]]
+
+    def filtrar(self, categoria=None, desde=None, ate=None):
+        """
+        Filtra registros por categoria (sem diferenciar maiúsculas) e/ou
+        intervalo de data de verificação (datas no formato dd/mm/aaaa).
+        """
+        indice = self._indice
+        candidatos = None
+        if desde is not None or ate is not None:
+            inicio = 0
+            fim = len(indice.datas)
+            if desde is not None:
+                inicio = bisect.bisect_left(indice.datas, (_converter_data(desde),))
+            if ate is not None:
+                fim = bisect.bisect_left(indice.datas, (_converter_data(ate) + 1,))
+            candidatos = {ip for _, ip in indice.datas[inicio:fim]}
+
+        if categoria is not None:
+            ips = indice.por_categoria.get(categoria.lower(), [])
+            if candidatos is not None:
+                ips = [ip for ip in ips if ip in candidatos]
+        elif candidatos is not None:
+            ips = [ip for ip in indice.ips_ordenados if ip in candidatos]
+        else:
+            ips = indice.ips_ordenados
+        return [indice.por_ip[ip] for ip in ips]
+
+    def buscar_indicador(self, valor):
+        """
+        Retorna os registros cujos comentários citam o indicador informado:
+        uma porta ("22"), protocolo ("tcp") ou serviço ("ssh").
+        """
+        indice = self._indice
+        return [indice.por_ip[ip] for ip in indice.por_indicador.get(str(valor).upper(), [])]
+
+    def top(self, criterio, n=10):
+        """Retorna os N valores mais frequentes para o critério informado."""
+        agregados = self._indice.agregados
+        if criterio not in agregados:
+            raise ValueError(
+                f"Critério inválido: {criterio}. Use um de: {', '.join(self.CRITERIOS_TOP)}."
+            )
+        return agregados[criterio].most_common(n)
+
+
+class _Indice:
+    """Estruturas de busca montadas a partir dos registros do histórico."""
+
+    def __init__(self, registros, repositorio):
+        self.por_ip = {}
+        self.por_categoria = {}
+        self.por_indicador = {}
+        self.datas = []  # Lista ordenada de (ordinal, ip), para busca com bisect
+        self.agregados = {criterio: Counter() for criterio in ConsultaHistorico.CRITERIOS_TOP}
+
+        numericos = []
+        for registro in registros:
+            ip = registro.get('ip')
+            try:
+                ip_num = int(ipaddress.IPv4Address(ip))
+            except (ipaddress.AddressValueError, TypeError):
+                logger.debug(f"IP inválido ignorado no histórico: {ip}")
+                continue
+            registro = self._resolver_comentarios(registro, ip, repositorio)
+            self.por_ip[ip] = registro
+            numericos.append((ip_num, ip))
+
+            for categoria in registro.get('categorias_reportadas', []):
+                if categoria == CATEGORIA_ERRO_CONSULTA:
+                    continue
+                self.por_categoria.setdefault(categoria.lower(), []).append(ip)
+                self.agregados['categoria'][categoria] += 1
+
+            data = _ler_data(registro.get('data_verificacao'))
+            if data is not None:
+                self.datas.append((data.toordinal(), ip))
+
+            self.agregados['prefixo24'][_prefixo24(ip)] += 1
+            sufixo = _sufixo_hostname(registro.get('hostname'))
+            if sufixo:
+                self.agregados['sufixo_hostname'][sufixo] += 1
+
+        numericos.sort()
+        self.ips_numericos = [num for num, _ in numericos]
+        self.ips_ordenados = [ip for _, ip in numericos]
+        self.datas.sort()
+
+    def _resolver_comentarios(self, registro, ip, repositorio):
+        """
+        Expande as referências de comentários para texto e indexa os
+        indicadores de cada comentário (de registros novos ou antigos).
+        """
+        comentarios = registro.get('comentarios_recentes', [])
+        indicadores = set()
+        for comentario in comentarios:
+            entrada = None
+            if isinstance(comentario, dict) and repositorio is not None:
+                entrada = repositorio.obter(comentario.get('id'))
+            if entrada is not None:
+                encontrados = entrada['indicadores']
+            elif isinstance(comentario, str):
+                encontrados = extrair_indicadores(separar_comentario(comentario)[1])
+            else:
+                continue
+            indicadores.update(str(p) for p in encontrados['portas'])
+            indicadores.update(encontrados['protocolos'])
+            indicadores.update(encontrados['servicos'])
+        for indicador in indicadores:
+            self.por_indicador.setdefault(indicador, []).append(ip)
+
+        if repositorio is not None and any(isinstance(c, dict) for c in comentarios):
+            registro = dict(registro, comentarios_recentes=repositorio.expandir(comentarios))
+        return registro
+
+
+def _ler_data(data_str):
+    if not data_str:
+        return None
+    try:
+        return datetime.strptime(data_str, FORMATO_DATA).date()
+    except ValueError:
+        logger.debug(f"Data em formato inesperado: {data_str}")
+        return None
+
+
+def _converter_data(data_str):
+    """Converte uma data dd/mm/aaaa informada pelo usuário em ordinal."""
+    return datetime.strptime(data_str, FORMATO_DATA).toordinal()
+
+
+def _prefixo24(ip):
+    return ip.rsplit('.', 1)[0] + ".0/24"
+
+
+# Sufixos públicos de segundo nível: para "x.locaweb.com.br" o sufixo
+# agregado deve ser "locaweb.com.br", e não "com.br".
+SUFIXOS_SEGUNDO_NIVEL = frozenset({
+    "com.br", "net.br", "org.br", "gov.br", "edu.br", "ind.br", "srv.br",
+    "art.br", "blog.br", "eco.br", "emp.br", "inf.br", "tv.br", "app.br",
+    "co.uk", "org.uk", "ac.uk", "com.au", "net.au", "com.ar", "com.mx",
+    "com.pt", "co.jp", "com.cn",
+})
+
+
+def _sufixo_hostname(hostname, niveis=2):
+    if not hostname or hostname == 'N/A':
+        return None
+    partes = hostname.strip('.').lower().split('.')
+    if '.'.join(partes[-2:]) in SUFIXOS_SEGUNDO_NIVEL:
+        niveis += 1
+    return '.'.join(partes[-niveis:])
+
+
+def criar_servidor(consulta, host="127.0.0.1", porta=8080):
+    """
+    Cria um servidor HTTP local (somente leitura) que responde em JSON:
+    /ip/<ip>, /cidr?rede=<cidr>, /filtrar?categoria=&desde=&ate=,
+    /indicador/<valor> e /top/<criterio>?n=<N>.
+    """
+
+    class ManipuladorConsulta(BaseHTTPRequestHandler):
+        def do_GET(self):
+            consulta.recarregar_se_alterado()
+            url = urlparse(self.path)
+            partes = [p for p in url.path.split('/') if p]
+            params = {k: v[0] for k, v in parse_qs(url.query).items()}
+            try:
+                status, corpo = self._resolver(partes, params)
+            except ValueError as e:
+                status, corpo = 400, {"erro": str(e)}
+            self._responder(status, corpo)
+
+        def _resolver(self, partes, params):
+            if len(partes) == 2 and partes[0] == 'ip':
+                registro = consulta.buscar_ip(partes[1])
+                if registro is None:
+                    return 404, {"erro": "IP não encontrado no histórico."}
+                return 200, registro
+            if len(partes) == 2 and partes[0] == 'indicador':
+                return 200, consulta.buscar_indicador(partes[1])
+            if partes == ['cidr']:
+                if 'rede' not in params:
+                    raise ValueError("Parâmetro obrigatório ausente: rede.")
+                return 200, consulta.buscar_cidr(params['rede'])
+            if partes == ['filtrar']:
+                return 200, consulta.filtrar(
+                    categoria=params.get('categoria'),
+                    desde=params.get('desde'),
+                    ate=params.get('ate'),
+                )
+            if len(partes) == 2 and partes[0] == 'top':
+                return 200, consulta.top(partes[1], int(params.get('n', 10)))
+            return 404, {"erro": "Rota não encontrada."}
+
+        def _responder(self, status, corpo):
+            dados = json.dumps(corpo, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(dados)))
+            self.end_headers()
+            self.wfile.write(dados)
+
+        def log_message(self, formato, *args):
+            logger.debug("%s - %s", self.address_string(), formato % args)
+
+    return ThreadingHTTPServer((host, porta), ManipuladorConsulta)
@@ -2,15 +2,10 @@
 
 import logging
 import os
-import smtplib
-import ssl  # For secure context
-from email.message import EmailMessage  # Modern way to construct emails
-from email.mime.application import MIMEApplication  # For attachments
 
-from dotenv import load_dotenv
-
-# Carrega as variáveis do .env para o ambiente (garante que estejam disponíveis)
-load_dotenv()
+# smtplib, ssl e email são importados dentro dos métodos: este módulo é
+# carregado em toda execução, mas só envia e-mail quando há IPs a reportar.
+# load_dotenv() não é chamado aqui, pois o main.py fará isso.
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +23,8 @@ class NotificadorEmail:
         self.sender_password = os.getenv("EMAIL_PASSWORD")
         self.receiver_email = os.getenv("EMAIL_RECEIVER")
 
+        import ssl  # For secure context
+
         # Contexto SSL seguro
         self.context = ssl.create_default_context()
 
@@ -49,6 +46,9 @@ class NotificadorEmail:
         """
         Envia um e-mail com o assunto, corpo HTML e, opcionalmente, um anexo.
         """
+        import smtplib
+        from email.message import EmailMessage  # Modern way to construct emails
+
         msg = EmailMessage()
         msg["Subject"] = assunto
         msg["From"] = self.sender_email
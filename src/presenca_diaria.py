@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+
+import json
+import logging
+import os
+from collections import defaultdict
+from datetime import date, timedelta
+
+logger = logging.getLogger(__name__)
+
+
+class PresencaDiaria:
+    """
+    Registra, por IP, em quais dias ele apareceu na blocklist usando um
+    bitset deslizante (um inteiro por IP, um bit por dia). O bit k de cada
+    IP corresponde ao dia `dia_base + k`. Uma janela de 365 dias ocupa
+    menos de 50 bytes por IP, e as consultas de tendência são apenas
+    máscaras e contagens de bits.
+    """
+
+    JANELA_DIAS = 365
+
+    def __init__(self, arquivo_presenca):
+        self.arquivo_presenca = arquivo_presenca
+        self.dia_base = None
+        self.dias_coletados = 0  # Bitset dos dias em que houve coleta
+        self.bitmaps = {}
+        self._carregar()
+
+    def _carregar(self):
+        if not os.path.exists(self.arquivo_presenca):
+            return
+        try:
+            with open(self.arquivo_presenca, 'r', encoding='utf-8') as f:
+                conteudo = f.read()
+            if not conteudo.strip():
+                return
+            dados = json.loads(conteudo)
+            self.dia_base = date.fromisoformat(dados['dia_base'])
+            self.dias_coletados = int(dados['dias_coletados'], 16)
+            self.bitmaps = {ip: int(bits, 16) for ip, bits in dados['ips'].items()}
+        except (json.JSONDecodeError, KeyError, ValueError, IOError):
+            logger.debug("Falha ao carregar o arquivo de presença diária.", exc_info=True)
+            self.dia_base = None
+            self.dias_coletados = 0
+            self.bitmaps = {}
+
+    def salvar(self):
+        if self.dia_base is None:
+            return
+        dados = {
+            "dia_base": self.dia_base.isoformat(),
+            "dias_coletados": format(self.dias_coletados, 'x'),
+            "ips": {ip: format(bits, 'x') for ip, bits in self.bitmaps.items()},
+        }
+        try:
+            with open(self.arquivo_presenca, 'w', encoding='utf-8') as f:
+                json.dump(dados, f, separators=(',', ':'))
+            logger.info(f"Presença diária salva em: {self.arquivo_presenca}")
+        except IOError:
+            logger.debug(f"Erro ao salvar o arquivo {self.arquivo_presenca}.", exc_info=True)
+
+    def _deslocar_janela(self, dias):
+        """Descarta os `dias` mais antigos da janela."""
+        self.dia_base += timedelta(days=dias)
+        self.dias_coletados >>= dias
+        deslocados = {}
+        for ip, bits in self.bitmaps.items():
+            bits >>= dias
+            if bits:
+                deslocados[ip] = bits
+        self.bitmaps = deslocados
+
+    def registrar(self, ips, dia):
+        """Marca os IPs informados como presentes na blocklist em `dia`."""
+        if self.dia_base is None:
+            self.dia_base = dia
+        indice = (dia - self.dia_base).days
+        if indice < 0:
+            logger.debug(f"Dia {dia} anterior ao início da janela; ignorado.")
+            return
+        if indice >= self.JANELA_DIAS:
+            self._deslocar_janela(indice - self.JANELA_DIAS + 1)
+            indice = self.JANELA_DIAS - 1
+
+        bit = 1 << indice
+        self.dias_coletados |= bit
+        for ip in ips:
+            self.bitmaps[ip] = self.bitmaps.get(ip, 0) | bit
+
+    def ultimo_dia(self):
+        """Último dia com coleta registrada, ou None."""
+        if not self.dias_coletados:
+            return None
+        return self.dia_base + timedelta(days=self.dias_coletados.bit_length() - 1)
+
+    def _mascara(self, inicio, fim):
+        """Máscara de bits para o intervalo fechado [inicio, fim]."""
+        if self.dia_base is None:
+            return 0
+        primeiro = max((inicio - self.dia_base).days, 0)
+        ultimo = (fim - self.dia_base).days
+        if ultimo < primeiro:
+            return 0
+        return ((1 << (ultimo - primeiro + 1)) - 1) << primeiro
+
+    def dias_listado(self, ip, ultimos_dias=90, referencia=None):
+        """
+        Retorna em quantos dias o IP esteve listado e em quantos houve coleta,
+        considerando os `ultimos_dias` até a data de referência.
+        """
+        referencia = referencia or self.ultimo_dia()
+        if referencia is None:
+            return {"dias_listado": 0, "dias_coletados": 0}
+        mascara = self._mascara(referencia - timedelta(days=ultimos_dias - 1), referencia)
+        return {
+            "dias_listado": (self.bitmaps.get(ip, 0) & mascara).bit_count(),
+            "dias_coletados": (self.dias_coletados & mascara).bit_count(),
+        }
+
+    def contagem_por_prefixo24(self, inicio, fim):
+        """Soma de IP-dias listados por /24 no intervalo [inicio, fim]."""
+        mascara = self._mascara(inicio, fim)
+        contagem = defaultdict(int)
+        if not mascara:
+            return contagem
+        for ip, bits in self.bitmaps.items():
+            dias = (bits & mascara).bit_count()
+            if dias:
+                contagem[ip.rsplit('.', 1)[0] + ".0/24"] += dias
+        return contagem
+
+    def tendencia_semanal(self, referencia=None, n=10):
+        """
+        Compara a semana encerrada em `referencia` com a semana anterior e
+        retorna os N prefixos /24 que mais pioraram (maior aumento de IP-dias).
+        """
+        referencia = referencia or self.ultimo_dia()
+        if referencia is None:
+            return []
+        atual = self.contagem_por_prefixo24(referencia - timedelta(days=6), referencia)
+        anterior = self.contagem_por_prefixo24(
+            referencia - timedelta(days=13), referencia - timedelta(days=7)
+        )
+        relatorio = [
+            {
+                "prefixo": prefixo,
+                "semana_atual": atual.get(prefixo, 0),
+                "semana_anterior": anterior.get(prefixo, 0),
+                "variacao": atual.get(prefixo, 0) - anterior.get(prefixo, 0),
+            }
+            for prefixo in set(atual) | set(anterior)
+        ]
+        relatorio.sort(key=lambda item: (-item["variacao"], item["prefixo"]))
+        return relatorio[:n]
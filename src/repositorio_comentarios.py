@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+import json
+import logging
+import os
+import re
+
+logger = logging.getLogger(__name__)
+
+# Padrões pré-compilados usados na normalização e extração de indicadores
+_ESPACOS = re.compile(r"\s+")
+_COMENTARIO_FORMATADO = re.compile(r"^\[([^\]]*)\] (.*)$", re.DOTALL)
+_PORTA = re.compile(
+    r"(?:\bports?\s*[:#=]?\s*|\bdpt\s*=\s*|\bdst[_ ]?port\s*[:=]?\s*)(\d{1,5})\b"
+    r"|\b(\d{1,5})/(?:tcp|udp)\b",  # Notação de scanners: "22/tcp"
+    re.IGNORECASE,
+)
+_PROTOCOLO = re.compile(r"\b(TCP|UDP|ICMP)\b", re.IGNORECASE)
+_SERVICO = re.compile(
+    r"\b(SSH|FTP|SMTP|IMAP|POP3|HTTPS?|RDP|Telnet|MySQL|MSSQL|PostgreSQL|SIP|DNS|SMB|VNC|WordPress)\b",
+    re.IGNORECASE,
+)
+
+
+def normalizar_comentarios(comentarios):
+    """Normaliza os espaços dos comentários de um lote com um padrão pré-compilado."""
+    return [_ESPACOS.sub(" ", comentario).strip() for comentario in comentarios]
+
+
+def extrair_indicadores(texto):
+    """Extrai portas, protocolos e serviços citados em um comentário."""
+    portas = {int(rotulada or barra) for rotulada, barra in _PORTA.findall(texto)}
+    return {
+        "portas": sorted(p for p in portas if p <= 65535),
+        "protocolos": sorted({p.upper() for p in _PROTOCOLO.findall(texto)}),
+        "servicos": sorted({s.upper() for s in _SERVICO.findall(texto)}),
+    }
+
+
+def id_comentario(texto):
+    """Identificador do comentário, derivado do próprio conteúdo."""
+    return hashlib.blake2b(texto.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def separar_comentario(comentario_formatado):
+    """Separa '[data] texto' em (data, texto). Sem data, retorna (None, texto)."""
+    encontrado = _COMENTARIO_FORMATADO.match(comentario_formatado)
+    if encontrado:
+        return encontrado.group(1), encontrado.group(2)
+    return None, comentario_formatado
+
+
+class RepositorioComentarios:
+    """
+    Tabela de comentários endereçada por conteúdo: cada texto distinto é
+    guardado uma única vez (com seus indicadores) e os registros do
+    histórico passam a referenciá-lo pelo ID, junto com a data do relatório.
+    """
+
+    def __init__(self, arquivo_comentarios):
+        self.arquivo_comentarios = arquivo_comentarios
+        self.tabela = self._carregar()
+
+    def _carregar(self):
+        if not os.path.exists(self.arquivo_comentarios):
+            return {}
+        try:
+            with open(self.arquivo_comentarios, 'r', encoding='utf-8') as f:
+                conteudo = f.read()
+            if not conteudo.strip():
+                return {}
+            return json.loads(conteudo)
+        except (json.JSONDecodeError, IOError):
+            logger.debug("Falha ao carregar a tabela de comentários.", exc_info=True)
+            return {}
+
+    def salvar(self):
+        try:
+            with open(self.arquivo_comentarios, 'w', encoding='utf-8') as f:
+                json.dump(self.tabela, f, ensure_ascii=False, separators=(',', ':'))
+            logger.info(f"Tabela de comentários salva em: {self.arquivo_comentarios}")
+            return True
+        except IOError:
+            logger.debug(f"Erro ao salvar o arquivo {self.arquivo_comentarios}.", exc_info=True)
+            return False
+
+    def adicionar(self, texto):
+        """Guarda o texto (se ainda não existir) e retorna seu ID."""
+        chave = id_comentario(texto)
+        if chave not in self.tabela:
+            self.tabela[chave] = {"texto": texto, "indicadores": extrair_indicadores(texto)}
+        return chave
+
+    def obter(self, chave):
+        return self.tabela.get(chave)
+
+    def compactar(self, comentarios):
+        """
+        Converte comentários '[data] texto' em referências {"data", "id"}.
+        Referências já compactadas são mantidas como estão.
+        """
+        referencias = []
+        for comentario in comentarios:
+            if isinstance(comentario, dict):
+                referencias.append(comentario)
+                continue
+            data, texto = separar_comentario(comentario)
+            referencias.append({"data": data, "id": self.adicionar(texto)})
+        return referencias
+
+    def expandir(self, referencias):
+        """Converte referências de volta para o formato '[data] texto'."""
+        comentarios = []
+        for referencia in referencias:
+            if not isinstance(referencia, dict):
+                comentarios.append(referencia)
+                continue
+            entrada = self.tabela.get(referencia.get("id"))
+            texto = entrada["texto"] if entrada else f"<comentário {referencia.get('id')} ausente>"
+            data = referencia.get("data")
+            comentarios.append(f"[{data}] {texto}" if data else texto)
+        return comentarios
+
+    def podar(self, ids_referenciados):
+        """
+        Remove da tabela os comentários que nenhum registro referencia mais
+        e retorna quantos foram removidos.
+        """
+        removidos = [chave for chave in self.tabela if chave not in ids_referenciados]
+        for chave in removidos:
+            del self.tabela[chave]
+        if removidos:
+            logger.debug(f"{len(removidos)} comentários órfãos removidos da tabela.")
+        return len(removidos)
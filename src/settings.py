@@ -1,4 +1,4 @@
-import logging.config
+import logging
 import os
 
 # --- Configuração de Log para DESENVOLVIMENTO ---
@@ -72,9 +72,21 @@ LOG_CONFIG_PROD = {
 # --- Seleção da Configuração ---
 # Verifica a variável de ambiente 'APP_ENV'.
 # Se for 'production', usa a config de produção. Caso contrário, usa a de desenvolvimento.
-if os.getenv("APP_ENV") == "production":
-    LOG_CONFIG_DICT = LOG_CONFIG_PROD
-    print("Usando configuração de log de PRODUÇÃO.")
-else:
-    LOG_CONFIG_DICT = LOG_CONFIG_DEV
-    print("Usando configuração de log de DESENVOLVIMENTO.")
+def obter_config_log():
+    if os.getenv("APP_ENV") == "production":
+        return LOG_CONFIG_PROD
+    return LOG_CONFIG_DEV
+
+
+def configurar_logging():
+    """
+    Aplica a configuração de log do ambiente atual. O módulo logging.config
+    (que arrasta socketserver, threading etc.) só é importado aqui, e não
+    na importação deste módulo.
+    """
+    import logging.config
+
+    config = obter_config_log()
+    logging.config.dictConfig(config)
+    ambiente = "PRODUÇÃO" if config is LOG_CONFIG_PROD else "DESENVOLVIMENTO"
+    logging.getLogger(__name__).info(f"Usando configuração de log de {ambiente}.")
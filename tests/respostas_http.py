@@ -0,0 +1,16 @@
+import io
+import requests
+from requests.structures import CaseInsensitiveDict
+
+def criar_resposta(corpo=b'{"ok": true}', status=200, headers=None, url='http://fake.com'):
+    """
+    Cria um requests.Response real cujo corpo vem de `raw`, como uma
+    resposta com stream=True, para exercitar a leitura feita pelo cliente.
+    """
+    resposta = requests.Response()
+    resposta.status_code = status
+    resposta.headers = CaseInsensitiveDict(headers or {})
+    resposta.url = url
+    resposta.encoding = 'utf-8'
+    resposta.raw = io.BytesIO(corpo)
+    return resposta
@@ -9,10 +9,10 @@ def mock_env(mocker):
 
 @pytest.fixture
 def mock_requests_get(mocker):
-    """Mocks the requests.get call."""
-    return mocker.patch('requests.get')
+    """Mocks the shared HTTP client's get call."""
+    return mocker.patch('src.abuseipdb_checker.obter_cliente_http').return_value.get
 
-def test_checker_init_success(mock_env):
+def test_checker_init_success(mock_env, mock_requests_get):
     """Tests successful initialization."""
     checker = AbuseIPDBChecker()
     assert checker.api_key == 'fake_api_key'
@@ -23,7 +23,13 @@ def test_checker_init_missing_key(mocker):
     """Tests that ValueError is raised if API key is missing."""
     mocker.patch('os.getenv', return_value=None)
     with pytest.raises(ValueError, match="Chave da API não configurada"):
-        AbuseIPDBChecker()
+        AbuseIPDBChecker(mocker.Mock(reproduzindo=False))
+
+def test_checker_init_sem_chave_ao_reproduzir_cassete(mocker):
+    """Tests that replaying a cassette does not require the API key."""
+    mocker.patch('os.getenv', return_value=None)
+    checker = AbuseIPDBChecker(mocker.Mock(reproduzindo=True))
+    assert checker.api_key is None
 
 def test_verificar_ip_sucesso(mock_env, mock_requests_get):
     """Tests a successful IP check with reports."""
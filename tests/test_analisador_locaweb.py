@@ -1,6 +1,13 @@
 
+import json
+from datetime import datetime
 import pytest
 from src.analisador_locaweb import AnalisadorLocaweb
+from src.cassete_http import CasseteHTTP
+from src.cliente_http import ClienteHTTP
+from src.presenca_diaria import PresencaDiaria
+from src.repositorio_comentarios import RepositorioComentarios, id_comentario
+from tests.respostas_http import criar_resposta
 
 # --- Mocks Fixtures ---
 
@@ -24,10 +31,11 @@ def mock_abuse_checker(mocker):
 
 @pytest.fixture
 def mock_requests_session(mocker):
-    """Mocks requests.Session and its get calls."""
-    mock_session_class = mocker.patch('requests.Session', autospec=True)
-    mock_session_instance = mock_session_class.return_value
-    mock_session_instance.headers = {}
+    """Mocks the shared HTTP client and its get calls."""
+    mock_session_instance = mocker.patch('src.analisador_locaweb.obter_cliente_http').return_value
+    mock_session_instance.resumo_metricas.return_value = "HTTP: 2 requisições"
+    mock_session_instance.reproduzindo = False
+    mock_session_instance.gravando = False
 
     # Mock para a resposta da blocklist
     mock_blocklist_response = mocker.Mock()
@@ -77,3 +85,158 @@ def test_executar_com_ip_novo(mock_fs, mock_requests_session, mock_abuse_checker
 
     # 3. Verifica escrita de arquivos
     assert mock_fs().write.call_count >= 3 # Pelo menos 3 escritas (diario, diario_kinghost, historico)
+
+def test_executar_registra_presenca_diaria(tmp_path, mocker, mock_requests_session, mock_abuse_checker, mock_notificador):
+    """
+    Tests that IPs found in the blocklist are recorded for 'hoje' and the presence file is saved.
+    """
+    mocker.patch('src.analisador_locaweb.time.sleep')
+    analisador = AnalisadorLocaweb(
+        url_blocklist='http://fake-blocklist.com',
+        arquivo_historico=str(tmp_path / 'historico.json'),
+        arquivo_diario=str(tmp_path / 'diario.json'),
+        arquivo_diario_kinghost=str(tmp_path / 'diario_kinghost.json'),
+        arquivo_presenca=str(tmp_path / 'presenca.json'),
+    )
+
+    analisador.executar()
+
+    presenca = PresencaDiaria(str(tmp_path / 'presenca.json'))
+    assert presenca.ultimo_dia() == analisador.hoje.date()
+    assert presenca.dias_listado('187.45.198.12') == {"dias_listado": 1, "dias_coletados": 1}
+
+def test_executar_registra_metricas_sem_ips(tmp_path, mocker, mock_requests_session, caplog):
+    """
+    Tests that the HTTP metrics summary is logged even when the blocklist yields no IPs.
+    """
+    mock_requests_session.get.side_effect = [mocker.Mock(text='')]
+    with caplog.at_level('INFO', logger='src.analisador_locaweb'):
+        _analisador_em_disco(tmp_path).executar()
+
+    mock_requests_session.resumo_metricas.assert_called_once()
+    assert "HTTP: 2 requisições" in caplog.text
+
+def _analisador_em_disco(tmp_path, **kwargs):
+    return AnalisadorLocaweb(
+        url_blocklist='http://fake-blocklist.com',
+        arquivo_historico=str(tmp_path / 'historico.json'),
+        arquivo_diario=str(tmp_path / 'diario.json'),
+        arquivo_diario_kinghost=str(tmp_path / 'diario_kinghost.json'),
+        arquivo_comentarios=str(tmp_path / 'comentarios.json'),
+        **kwargs,
+    )
+
+def test_historico_compacta_comentarios_e_recarrega(tmp_path, mocker, mock_requests_session, mock_abuse_checker, mock_notificador):
+    """
+    Tests that history comments are stored as references and survive a reload and re-save.
+    """
+    mocker.patch('src.analisador_locaweb.time.sleep')
+    _analisador_em_disco(tmp_path).executar()
+
+    historico = json.loads((tmp_path / 'historico.json').read_text(encoding='utf-8'))
+    referencias = historico[0]['comentarios_recentes']
+    assert referencias == [{"data": None, "id": id_comentario('Email spam activity')}]
+    diario = json.loads((tmp_path / 'diario_kinghost.json').read_text(encoding='utf-8'))
+    assert diario[0]['comentarios_recentes'] == ['Email spam activity']  # Anexo com texto completo
+
+    # Segunda execução: o IP é recente, o histórico compactado é recarregado e salvo de novo
+    blocklist = mocker.Mock(text='187.45.198.12    AS27699    Locaweb Servicos de Internet S/A')
+    mock_requests_session.get.side_effect = [blocklist]
+    analisador = _analisador_em_disco(tmp_path)
+    assert analisador._carregar_historico()['187.45.198.12']['comentarios_recentes'] == referencias
+    analisador.executar()
+
+    repositorio = RepositorioComentarios(str(tmp_path / 'comentarios.json'))
+    historico = json.loads((tmp_path / 'historico.json').read_text(encoding='utf-8'))
+    assert repositorio.expandir(historico[0]['comentarios_recentes']) == ['Email spam activity']
+
+def test_falha_ao_salvar_historico_nao_poda_comentarios(tmp_path, mocker, mock_requests_session, mock_abuse_checker, mock_notificador):
+    """
+    Tests that comments still referenced by the on-disk history are kept if the history write fails.
+    """
+    mocker.patch('src.analisador_locaweb.time.sleep')
+    repositorio = RepositorioComentarios(str(tmp_path / 'comentarios.json'))
+    antigo = repositorio.adicionar('Old SSH brute force')
+    repositorio.salvar()
+    (tmp_path / 'historico.json').write_text(json.dumps([{
+        'ip': '187.45.198.12',
+        'data_verificacao': '01/01/2020',  # Mais de 30 dias: será reportado de novo
+        'comentarios_recentes': [{'data': '01/01/2020 10:00:00', 'id': antigo}],
+    }]), encoding='utf-8')
+
+    analisador = _analisador_em_disco(tmp_path)
+    salvar_json = analisador._salvar_json
+    mocker.patch.object(
+        analisador, '_salvar_json',
+        side_effect=lambda caminho, dados: False if caminho.endswith('historico.json') else salvar_json(caminho, dados),
+    )
+    analisador.executar()
+
+    tabela = RepositorioComentarios(str(tmp_path / 'comentarios.json')).tabela
+    assert antigo in tabela
+    assert id_comentario('Email spam activity') in tabela
+
+def _servidor_falso(metodo, url, **kwargs):
+    """Responde à blocklist, ao ip-api e ao AbuseIPDB conforme a URL."""
+    if url == 'http://fake-blocklist.com':
+        return criar_resposta(corpo=(
+            b'187.45.198.12    AS27699    Locaweb Servicos de Internet S/A\n'
+            b'187.45.198.13    AS27699    Locaweb Servicos de Internet S/A\n'
+        ), url=url)
+    if url.startswith('http://ip-api.com/json/'):
+        ip = url.split('/')[-1].split('?')[0]
+        corpo = json.dumps({"status": "success", "reverse": f"host-{ip}.kinghost.net"})
+        return criar_resposta(corpo=corpo.encode('utf-8'), url=url)
+    corpo = json.dumps({"data": {"results": [
+        {"categories": [22], "comment": "SSH  brute force", "reportedAt": "2026-01-14T10:00:00+00:00"},
+    ]}})
+    return criar_resposta(corpo=corpo.encode('utf-8'), url=url)
+
+def _analisador_com_cassete(dados, cassete):
+    return AnalisadorLocaweb(
+        url_blocklist='http://fake-blocklist.com',
+        arquivo_historico=str(dados / 'historico.json'),
+        arquivo_diario=str(dados / 'diario.json'),
+        arquivo_diario_kinghost=str(dados / 'diario_kinghost.json'),
+        arquivo_presenca=str(dados / 'presenca.json'),
+        arquivo_comentarios=str(dados / 'comentarios.json'),
+        cliente_http=ClienteHTTP(cassete=cassete),
+    )
+
+def test_reproducao_repete_execucao_gravada(tmp_path, mocker, monkeypatch, mock_notificador):
+    """
+    Tests that replaying a recorded run restores its date and input history,
+    produces the same daily report and leaves the data directory untouched.
+    """
+    monkeypatch.setenv('ABUSEIPDB_API_KEY', 'chave-de-teste')
+    mocker.patch('src.analisador_locaweb.time.sleep')
+    dados = tmp_path / 'data'
+    dados.mkdir()
+    # .12 é novo; .13 foi verificado 10 dias antes da execução gravada
+    (dados / 'historico.json').write_text(json.dumps([{
+        'ip': '187.45.198.13', 'data_verificacao': '05/01/2026', 'comentarios_recentes': [],
+    }]), encoding='utf-8')
+    arquivo_cassete = str(tmp_path / 'cassete.jsonl.gz')
+
+    gravador = _analisador_com_cassete(dados, CasseteHTTP(arquivo_cassete, "gravar"))
+    gravador.hoje = datetime(2026, 1, 15, 8, 30)
+    mocker.patch.object(gravador.cliente.sessao, 'request', side_effect=_servidor_falso)
+    gravador.executar()
+
+    gravado = json.loads((dados / 'diario_kinghost.json').read_text(encoding='utf-8'))
+    assert [registro['ip'] for registro in gravado] == ['187.45.198.12']
+    arquivos_de_dados = {arquivo.name: arquivo.read_bytes() for arquivo in dados.iterdir()}
+
+    # A reprodução roda sem a chave da API, como na máquina de um analista
+    monkeypatch.delenv('ABUSEIPDB_API_KEY')
+    saida = tmp_path / 'saida'
+    reprodutor = _analisador_com_cassete(
+        dados, CasseteHTTP(arquivo_cassete, "reproduzir", diretorio_saida=str(saida))
+    )
+    mocker.patch.object(reprodutor.cliente.sessao, 'request', side_effect=AssertionError("acesso à rede"))
+    reprodutor.executar()
+
+    assert reprodutor.hoje == datetime(2026, 1, 15, 8, 30)
+    assert json.loads((saida / 'diario_kinghost.json').read_text(encoding='utf-8')) == gravado
+    assert {arquivo.name: arquivo.read_bytes() for arquivo in dados.iterdir()} == arquivos_de_dados
+    mock_notificador.enviar_email.assert_called_once()  # Apenas na gravação
@@ -0,0 +1,72 @@
+import pytest
+import requests
+from src.cassete_http import CasseteHTTP
+from src.cliente_http import ClienteHTTP
+from tests.respostas_http import criar_resposta
+
+def _resposta(corpo=b'{"status": "success", "reverse": "mail.kinghost.net"}'):
+    return criar_resposta(
+        corpo=corpo,
+        headers={'Content-Type': 'application/json', 'Set-Cookie': 'segredo'},
+        url='http://ip-api.com/json/187.45.198.12',
+    )
+
+@pytest.fixture
+def arquivo_cassete(tmp_path):
+    return str(tmp_path / "cassete.jsonl.gz")
+
+@pytest.fixture
+def saida(tmp_path):
+    return str(tmp_path / "saida")
+
+def test_gravar_e_reproduzir(arquivo_cassete, saida, mocker):
+    gravador = ClienteHTTP(cassete=CasseteHTTP(arquivo_cassete, "gravar"))
+    mocker.patch.object(gravador.sessao, 'request', return_value=_resposta())
+    gravador.get('http://ip-api.com/json/187.45.198.12', params={'fields': 'reverse'})
+
+    reprodutor = ClienteHTTP(cassete=CasseteHTTP(arquivo_cassete, "reproduzir", diretorio_saida=saida))
+    mock_request = mocker.patch.object(reprodutor.sessao, 'request')
+    resposta = reprodutor.get(
+        'http://ip-api.com/json/187.45.198.12', params={'fields': 'reverse'}, headers={'Key': 'x'}
+    )
+
+    mock_request.assert_not_called()
+    assert reprodutor.reproduzindo
+    assert resposta.json()["reverse"] == "mail.kinghost.net"
+    assert resposta.headers['content-type'] == 'application/json'
+    assert 'Set-Cookie' not in resposta.headers
+
+def test_reproduz_respostas_na_ordem_gravada(arquivo_cassete, saida, mocker):
+    gravador = ClienteHTTP(cassete=CasseteHTTP(arquivo_cassete, "gravar"))
+    mocker.patch.object(gravador.sessao, 'request', side_effect=[
+        _resposta(corpo=b'primeira'),
+        _resposta(corpo=b'\xff\xfe segunda'),  # Corpo binário
+    ])
+    gravador.get('http://fake.com')
+    gravador.get('http://fake.com')
+
+    cassete = CasseteHTTP(arquivo_cassete, "reproduzir", diretorio_saida=saida)
+    assert cassete.reproduzir('GET', 'http://fake.com').content == b'primeira'
+    assert cassete.reproduzir('GET', 'http://fake.com').content == b'\xff\xfe segunda'
+    # A última resposta é reaproveitada quando a execução pede mais vezes
+    assert cassete.reproduzir('GET', 'http://fake.com').content == b'\xff\xfe segunda'
+
+def test_reproduzir_requisicao_nao_gravada(arquivo_cassete, saida):
+    CasseteHTTP(arquivo_cassete, "gravar")
+    cassete = CasseteHTTP(arquivo_cassete, "reproduzir", diretorio_saida=saida)
+
+    with pytest.raises(requests.exceptions.ConnectionError, match="Nenhuma resposta gravada"):
+        cassete.reproduzir('GET', 'http://fake.com')
+
+def test_latencia_simulada(arquivo_cassete, saida, mocker):
+    gravador = ClienteHTTP(cassete=CasseteHTTP(arquivo_cassete, "gravar"))
+    mocker.patch.object(gravador.sessao, 'request', return_value=_resposta())
+    gravador.get('http://fake.com')
+
+    mock_sleep = mocker.patch('src.cassete_http.time.sleep')
+    CasseteHTTP(arquivo_cassete, "reproduzir", fator_latencia=1.0, diretorio_saida=saida).reproduzir('GET', 'http://fake.com')
+    mock_sleep.assert_called_once()
+
+def test_modo_invalido(arquivo_cassete):
+    with pytest.raises(ValueError, match="Modo de cassete inválido"):
+        CasseteHTTP(arquivo_cassete, "tocar")
@@ -0,0 +1,97 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+import pytest
+import requests
+from src.cliente_http import ClienteHTTP, RespostaMuitoGrandeError
+from tests.respostas_http import criar_resposta
+
+@pytest.fixture
+def mock_sleep(mocker):
+    return mocker.patch('src.cliente_http.time.sleep')
+
+@pytest.fixture
+def cliente(mocker):
+    cliente = ClienteHTTP(timeout_conexao=2, timeout_leitura=10, tamanho_maximo=100)
+    mocker.patch.object(cliente.sessao, 'request')
+    return cliente
+
+def test_get_sucesso_com_timeout(cliente):
+    cliente.sessao.request.return_value = criar_resposta()
+
+    resposta = cliente.get('http://fake.com', params={'a': 1})
+
+    cliente.sessao.request.assert_called_once_with(
+        'GET', 'http://fake.com', stream=True, params={'a': 1}, timeout=(2, 10)
+    )
+    assert resposta.json() == {"ok": True}
+    assert resposta.text == '{"ok": true}'
+    assert cliente.metricas['requisicoes'] == 1
+    assert cliente.metricas['retentativas'] == 0
+
+def test_get_repete_em_status_retentavel(cliente, mock_sleep):
+    cliente.sessao.request.side_effect = [
+        criar_resposta(status=503, headers={'Retry-After': '2'}),
+        criar_resposta(),
+    ]
+
+    resposta = cliente.get('http://fake.com')
+
+    assert resposta.status_code == 200
+    mock_sleep.assert_called_once_with(2.0)
+    assert cliente.metricas['retentativas'] == 1
+
+@pytest.mark.parametrize("retry_after", ['86400', 'Wed, 21 Oct 2099 07:28:00 GMT', 'amanhã'])
+def test_get_nao_repete_com_retry_after_acima_do_limite(cliente, mock_sleep, retry_after):
+    cliente.sessao.request.return_value = criar_resposta(
+        corpo=b'{"errors": []}', status=429, headers={'Retry-After': retry_after}
+    )
+
+    resposta = cliente.get('http://fake.com')
+
+    assert resposta.status_code == 429
+    assert resposta.json() == {"errors": []}
+    assert cliente.sessao.request.call_count == 1
+    mock_sleep.assert_not_called()
+
+def test_espera_respeita_retry_after_em_data_http(cliente):
+    daqui_a_pouco = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=10), usegmt=True)
+
+    assert 5 <= cliente._calcular_espera(1, daqui_a_pouco) <= 10
+
+def test_get_esgota_tentativas_em_erro_de_conexao(cliente, mock_sleep):
+    cliente.sessao.request.side_effect = requests.exceptions.ConnectionError
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        cliente.get('http://fake.com')
+
+    assert cliente.sessao.request.call_count == 3
+    assert mock_sleep.call_count == 2
+    assert cliente.metricas['falhas'] == 1
+
+def test_post_nao_e_repetido(cliente, mock_sleep):
+    cliente.sessao.request.side_effect = requests.exceptions.Timeout
+
+    with pytest.raises(requests.exceptions.Timeout):
+        cliente.post('http://fake.com')
+
+    assert cliente.sessao.request.call_count == 1
+    mock_sleep.assert_not_called()
+
+def test_resposta_acima_do_limite(cliente):
+    cliente.sessao.request.return_value = criar_resposta(corpo=b'x' * 101)
+
+    with pytest.raises(RespostaMuitoGrandeError):
+        cliente.get('http://fake.com')
+
+def test_espera_com_jitter_respeita_teto():
+    cliente = ClienteHTTP(backoff_base=1.0, backoff_max=4.0)
+    for tentativa in range(1, 6):
+        espera = cliente._calcular_espera(tentativa)
+        teto = min(4.0, 2 ** (tentativa - 1))
+        assert teto / 2 <= espera <= teto
+
+def test_resposta_acima_do_limite_declarado(cliente):
+    cliente.sessao.request.return_value = criar_resposta(headers={'Content-Length': '500'})
+
+    with pytest.raises(RespostaMuitoGrandeError, match="declara 500 bytes"):
+        cliente.get('http://fake.com')
@@ -0,0 +1,162 @@
+import json
+import os
+import threading
+import urllib.error
+import urllib.request
+import pytest
+from src.consulta_historico import ConsultaHistorico, criar_servidor
+from src.repositorio_comentarios import RepositorioComentarios
+
+HISTORICO = [
+    {
+        "ip": "187.45.198.12",
+        "hostname": "mail.kinghost.net",
+        "data_verificacao": "01/09/2025",
+        "categorias_reportadas": ["SSH", "Brute-Force"],
+    },
+    {
+        "ip": "187.45.198.200",
+        "hostname": "web01.kinghost.net",
+        "data_verificacao": "10/09/2025",
+        "categorias_reportadas": ["Port Scan"],
+    },
+    {
+        "ip": "200.234.200.5",
+        "hostname": "N/A",
+        "data_verificacao": "15/09/2025",
+        "categorias_reportadas": ["SSH"],
+    },
+]
+
+@pytest.fixture
+def arquivo_historico(tmp_path):
+    caminho = tmp_path / "historico.json"
+    caminho.write_text(json.dumps(HISTORICO), encoding="utf-8")
+    return caminho
+
+def test_buscar_ip(arquivo_historico):
+    consulta = ConsultaHistorico(str(arquivo_historico))
+    assert consulta.buscar_ip("200.234.200.5")["data_verificacao"] == "15/09/2025"
+    assert consulta.buscar_ip("1.2.3.4") is None
+
+def test_buscar_cidr(arquivo_historico):
+    consulta = ConsultaHistorico(str(arquivo_historico))
+    ips = [r["ip"] for r in consulta.buscar_cidr("187.45.198.0/24")]
+    assert ips == ["187.45.198.12", "187.45.198.200"]
+
+def test_filtrar_por_categoria_e_data(arquivo_historico):
+    consulta = ConsultaHistorico(str(arquivo_historico))
+    assert [r["ip"] for r in consulta.filtrar(categoria="ssh")] == ["187.45.198.12", "200.234.200.5"]
+    assert [r["ip"] for r in consulta.filtrar(categoria="SSH", desde="02/09/2025")] == ["200.234.200.5"]
+    assert [r["ip"] for r in consulta.filtrar(desde="01/09/2025", ate="10/09/2025")] == [
+        "187.45.198.12", "187.45.198.200"
+    ]
+
+def test_top(arquivo_historico):
+    consulta = ConsultaHistorico(str(arquivo_historico))
+    assert consulta.top("categoria", 1) == [("SSH", 2)]
+    assert consulta.top("prefixo24", 1) == [("187.45.198.0/24", 2)]
+    assert consulta.top("sufixo_hostname") == [("kinghost.net", 2)]
+    with pytest.raises(ValueError, match="Critério inválido"):
+        consulta.top("asn")
+
+def test_marcador_de_erro_nao_e_categoria(tmp_path):
+    caminho = tmp_path / "historico.json"
+    caminho.write_text(json.dumps(HISTORICO + [{
+        "ip": "187.45.198.50",
+        "categorias_reportadas": ["Erro na consulta"],
+    }]), encoding="utf-8")
+
+    consulta = ConsultaHistorico(str(caminho))
+
+    assert consulta.filtrar(categoria="Erro na consulta") == []
+    assert "Erro na consulta" not in dict(consulta.top("categoria"))
+    assert consulta.buscar_ip("187.45.198.50") is not None
+
+def test_recarrega_quando_historico_muda(arquivo_historico):
+    consulta = ConsultaHistorico(str(arquivo_historico))
+    assert consulta.recarregar_se_alterado() is False
+
+    arquivo_historico.write_text(json.dumps(HISTORICO[:1]), encoding="utf-8")
+    os.utime(arquivo_historico, ns=(0, 0))  # Garante mudança de mtime
+    assert consulta.recarregar_se_alterado() is True
+    assert consulta.buscar_ip("200.234.200.5") is None
+
+def test_historico_inexistente(tmp_path):
+    consulta = ConsultaHistorico(str(tmp_path / "nao_existe.json"))
+    assert consulta.buscar_cidr("0.0.0.0/0") == []
+
+def test_buscar_indicador_com_tabela_de_comentarios(tmp_path):
+    repositorio = RepositorioComentarios(str(tmp_path / "comentarios.json"))
+    registros = [dict(r) for r in HISTORICO]
+    registros[0]["comentarios_recentes"] = repositorio.compactar(
+        ["[01/09/2025 10:00:00] SSH brute force on port 22"]
+    )
+    registros[1]["comentarios_recentes"] = ["[10/09/2025 08:00:00] UDP scan"]  # Formato antigo
+    repositorio.salvar()
+    caminho = tmp_path / "historico.json"
+    caminho.write_text(json.dumps(registros), encoding="utf-8")
+
+    consulta = ConsultaHistorico(str(caminho), str(tmp_path / "comentarios.json"))
+
+    assert [r["ip"] for r in consulta.buscar_indicador("ssh")] == ["187.45.198.12"]
+    assert [r["ip"] for r in consulta.buscar_indicador(22)] == ["187.45.198.12"]
+    assert [r["ip"] for r in consulta.buscar_indicador("udp")] == ["187.45.198.200"]
+    assert consulta.buscar_ip("187.45.198.12")["comentarios_recentes"] == [
+        "[01/09/2025 10:00:00] SSH brute force on port 22"
+    ]
+
+def test_top_sufixo_hostname_com_dominio_br(tmp_path):
+    registros = [
+        {"ip": "187.45.198.12", "hostname": "hm1234.locaweb.com.br"},
+        {"ip": "187.45.198.13", "hostname": "hm5678.locaweb.com.br"},
+        {"ip": "177.153.1.1", "hostname": "x.kinghost.com.br"},
+    ]
+    caminho = tmp_path / "historico.json"
+    caminho.write_text(json.dumps(registros), encoding="utf-8")
+
+    consulta = ConsultaHistorico(str(caminho))
+
+    assert consulta.top("sufixo_hostname") == [("locaweb.com.br", 2), ("kinghost.com.br", 1)]
+
+def test_cli_consulta_invalida_retorna_erro(arquivo_historico, capsys):
+    import consulta
+
+    assert consulta.main(["--historico", str(arquivo_historico), "cidr", "999.1.1.0/24"]) == 1
+    assert consulta.main(["--historico", str(arquivo_historico), "filtrar", "--desde", "2025-09-01"]) == 1
+    assert "Consulta inválida" in capsys.readouterr().err
+
+@pytest.fixture
+def servidor(arquivo_historico):
+    servidor = criar_servidor(ConsultaHistorico(str(arquivo_historico)), porta=0)
+    thread = threading.Thread(target=servidor.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{servidor.server_address[1]}"
+    servidor.shutdown()
+    servidor.server_close()
+
+def _obter(url):
+    try:
+        with urllib.request.urlopen(url) as resposta:
+            return resposta.status, json.loads(resposta.read())
+    except urllib.error.HTTPError as erro:
+        return erro.code, json.loads(erro.read())
+
+def test_servidor_rotas(servidor, arquivo_historico):
+    status, corpo = _obter(f"{servidor}/ip/187.45.198.12")
+    assert status == 200 and corpo["hostname"] == "mail.kinghost.net"
+    assert _obter(f"{servidor}/cidr?rede=187.45.198.0/24")[0] == 200
+    assert _obter(f"{servidor}/cidr?rede=bad")[0] == 400
+    assert _obter(f"{servidor}/top/categoria?n=abc")[0] == 400
+    assert _obter(f"{servidor}/top/x")[0] == 400
+    assert _obter(f"{servidor}/nao/existe")[0] == 404
+    assert _obter(f"{servidor}/ip/1.2.3.4")[0] == 404
+
+    status, corpo = _obter(f"{servidor}/cidr")
+    assert status == 400 and "rede" in corpo["erro"]
+
+def test_servidor_recarrega_historico(servidor, arquivo_historico):
+    assert _obter(f"{servidor}/ip/10.0.0.1")[0] == 404
+    arquivo_historico.write_text(json.dumps(HISTORICO + [{"ip": "10.0.0.1"}]), encoding="utf-8")
+
+    assert _obter(f"{servidor}/ip/10.0.0.1")[0] == 200
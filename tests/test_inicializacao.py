@@ -0,0 +1,98 @@
+import os
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Orçamentos generosos para uma execução "sem nada a fazer" (blocklist vazia):
+# o objetivo é pegar regressões grosseiras (um subsistema pesado voltando a
+# ser carregado sem necessidade), não medir ruído de máquina.
+ORCAMENTO_EXECUCAO_MS = 400
+ORCAMENTO_IMPORTACOES_MS = 300
+
+# Executa main.main() com o HTTP substituído por uma blocklist vazia e
+# imprime o tempo total. As importações feitas dentro de main() (dotenv,
+# settings, analisador, requests, cliente HTTP...) entram na medição.
+DRIVER_EXECUCAO_VAZIA = """
+import io, sys, time
+from unittest import mock
+sys.path.insert(0, {raiz!r})
+import main
+inicio = time.perf_counter()
+def blocklist_vazia(self, metodo, url, **kwargs):
+    import requests
+    resposta = requests.Response()
+    resposta.status_code = 200
+    resposta.url = url
+    resposta.raw = io.BytesIO(b"")
+    return resposta
+with mock.patch("requests.sessions.Session.request", blocklist_vazia):
+    main.main()
+print("TEMPO_MS", (time.perf_counter() - inicio) * 1000)
+"""
+
+MODULOS_PESADOS = ("requests", "smtplib", "ssl", "email.message", "logging.config", "dotenv")
+
+def _executar(codigo, *opcoes, cwd=RAIZ):
+    return subprocess.run(
+        [sys.executable, *opcoes, "-c", codigo],
+        cwd=cwd, capture_output=True, text=True, check=True,
+    )
+
+def _relatorio_importtime(stderr):
+    """
+    Converte a saída de `-X importtime` em [(cumulativo_us, modulo)],
+    considerando apenas as importações de primeiro nível (sem indentação),
+    para que o tempo de cada subárvore seja contado uma única vez.
+    """
+    linhas = []
+    for linha in stderr.splitlines():
+        if not linha.startswith("import time:") or "cumulative" in linha:
+            continue
+        _, cumulativo, modulo = linha[len("import time:"):].split("|")
+        if modulo[1:].startswith(" "):
+            continue
+        linhas.append((int(cumulativo), modulo.strip()))
+    return linhas
+
+def test_importar_main_nao_carrega_subsistemas():
+    """Importar o main.py não deve carregar HTTP, e-mail ou logging.config, nem imprimir nada."""
+    resultado = _executar(
+        "import sys, main; "
+        f"print(','.join(m for m in {MODULOS_PESADOS!r} if m in sys.modules))"
+    )
+    assert resultado.stdout.strip() == ""
+
+def test_importar_notificador_nao_carrega_smtp():
+    resultado = _executar(
+        "import sys, src.notificador_email; "
+        "print(','.join(m for m in ('smtplib', 'ssl', 'dotenv') if m in sys.modules))"
+    )
+    assert resultado.stdout.strip() == ""
+
+def test_execucao_sem_nada_a_fazer(tmp_path):
+    """
+    Mede main.main() de ponta a ponta com blocklist vazia, com relatório
+    no estilo `-X importtime` das importações feitas pela execução.
+    Rode com `pytest -s` para ver o relatório.
+    """
+    (tmp_path / "data").mkdir()
+    (tmp_path / "logs").mkdir()
+
+    resultado = _executar(
+        DRIVER_EXECUCAO_VAZIA.format(raiz=RAIZ), "-X", "importtime", cwd=tmp_path
+    )
+
+    tempo_ms = float(resultado.stdout.split("TEMPO_MS")[1])
+    # Só interessam as importações feitas depois de `import main`
+    stderr = resultado.stderr.split("| main\n", 1)[1]
+    relatorio = _relatorio_importtime(stderr)
+    importacoes_ms = sum(tempo for tempo, _ in relatorio) / 1000
+
+    print(f"\nExecução sem nada a fazer: {tempo_ms:.1f} ms ({importacoes_ms:.1f} ms em importações)")
+    for tempo, modulo in sorted(relatorio, reverse=True)[:10]:
+        print(f"{tempo / 1000:8.1f} ms  {modulo}")
+
+    assert (tmp_path / "data" / "novos_locaweb_diario.json").read_text() == "[]"
+    assert importacoes_ms < ORCAMENTO_IMPORTACOES_MS
+    assert tempo_ms < ORCAMENTO_EXECUCAO_MS
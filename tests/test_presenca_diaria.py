@@ -0,0 +1,54 @@
+from datetime import date, timedelta
+from src.presenca_diaria import PresencaDiaria
+
+INICIO = date(2025, 9, 1)
+
+def test_dias_listado(tmp_path):
+    presenca = PresencaDiaria(str(tmp_path / "presenca.json"))
+    for i in range(10):
+        ips = ["187.45.198.12"] if i % 2 == 0 else []
+        presenca.registrar(ips, INICIO + timedelta(days=i))
+
+    resultado = presenca.dias_listado("187.45.198.12", ultimos_dias=90)
+    assert resultado == {"dias_listado": 5, "dias_coletados": 10}
+    assert presenca.dias_listado("187.45.198.12", ultimos_dias=3)["dias_listado"] == 1
+    assert presenca.dias_listado("1.2.3.4")["dias_listado"] == 0
+
+def test_salvar_e_carregar(tmp_path):
+    caminho = str(tmp_path / "presenca.json")
+    presenca = PresencaDiaria(caminho)
+    presenca.registrar(["187.45.198.12", "187.45.198.13"], INICIO)
+    presenca.registrar(["187.45.198.12"], INICIO + timedelta(days=1))
+    presenca.salvar()
+
+    recarregada = PresencaDiaria(caminho)
+    assert recarregada.ultimo_dia() == INICIO + timedelta(days=1)
+    assert recarregada.dias_listado("187.45.198.12")["dias_listado"] == 2
+    assert recarregada.dias_listado("187.45.198.13")["dias_listado"] == 1
+
+def test_janela_deslizante_descarta_dias_antigos(tmp_path):
+    presenca = PresencaDiaria(str(tmp_path / "presenca.json"))
+    presenca.registrar(["187.45.198.12"], INICIO)
+    presenca.registrar(["187.45.198.13"], INICIO + timedelta(days=PresencaDiaria.JANELA_DIAS))
+
+    assert presenca.dia_base == INICIO + timedelta(days=1)
+    assert "187.45.198.12" not in presenca.bitmaps
+    assert presenca.dias_listado("187.45.198.13", ultimos_dias=1)["dias_listado"] == 1
+
+def test_tendencia_semanal(tmp_path):
+    presenca = PresencaDiaria(str(tmp_path / "presenca.json"))
+    for i in range(14):
+        ips = ["200.234.200.5"]
+        if i >= 7:  # Segunda semana: /24 da Locaweb piora
+            ips += ["187.45.198.12", "187.45.198.13"]
+        presenca.registrar(ips, INICIO + timedelta(days=i))
+
+    relatorio = presenca.tendencia_semanal()
+    assert relatorio[0] == {
+        "prefixo": "187.45.198.0/24",
+        "semana_atual": 14,
+        "semana_anterior": 0,
+        "variacao": 14,
+    }
+    assert relatorio[1]["prefixo"] == "200.234.200.0/24"
+    assert relatorio[1]["variacao"] == 0
@@ -0,0 +1,47 @@
+from src.repositorio_comentarios import (
+    RepositorioComentarios,
+    extrair_indicadores,
+    normalizar_comentarios,
+)
+
+def test_normalizar_comentarios_em_lote():
+    assert normalizar_comentarios(["  SSH  brute\nforce ", "Port\tscan"]) == [
+        "SSH brute force", "Port scan"
+    ]
+
+def test_extrair_indicadores():
+    indicadores = extrair_indicadores("Blocked TCP SYN to port 22 (SSH); DPT=3389 rdp attempt")
+    assert indicadores == {
+        "portas": [22, 3389],
+        "protocolos": ["TCP"],
+        "servicos": ["RDP", "SSH"],
+    }
+    assert extrair_indicadores("22/tcp open ssh, 53/UDP open")["portas"] == [22, 53]
+    assert extrair_indicadores("ratio 1/2, 99999/tcp")["portas"] == []
+
+def test_compactar_deduplica_e_expandir_restaura(tmp_path):
+    repositorio = RepositorioComentarios(str(tmp_path / "comentarios.json"))
+    comentarios = [
+        "[01/09/2025 10:00:00] SSH brute force attempt",
+        "[02/09/2025 11:00:00] SSH brute force attempt",
+    ]
+
+    referencias = repositorio.compactar(comentarios)
+
+    assert len(repositorio.tabela) == 1
+    assert referencias[0]["id"] == referencias[1]["id"]
+    assert referencias[1]["data"] == "02/09/2025 11:00:00"
+    assert repositorio.compactar(referencias) == referencias  # Idempotente
+    assert repositorio.expandir(referencias) == comentarios
+
+def test_salvar_carregar_e_podar(tmp_path):
+    caminho = str(tmp_path / "comentarios.json")
+    repositorio = RepositorioComentarios(caminho)
+    mantido = repositorio.adicionar("Port scan on TCP port 445")
+    repositorio.adicionar("Comentário órfão")
+    repositorio.podar({mantido})
+    repositorio.salvar()
+
+    recarregado = RepositorioComentarios(caminho)
+    assert list(recarregado.tabela) == [mantido]
+    assert recarregado.obter(mantido)["indicadores"]["portas"] == [445]